@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+# === 6. 고속 추론 엔진 (대량 시세 재평가용) ===
+# 설명: 학습된 RandomForest / GradientBoosting 모델의 트리들을
+#       노드당 16바이트 레코드(특성 번호, float32 임계값, 왼쪽/오른쪽 자식)를
+#       트리별 깊이 우선 순서로 이어 붙인 배열로 펼쳐서,
+#       큰 배치를 컴파일된 커널(numba, 추론커널.py)로 여러 코어에서 한꺼번에 탐색합니다.
+#       numba가 없으면 NumPy 벡터 연산으로 대신 계산합니다. (결과는 같지만,
+#       대량 배치에서는 기본 model.predict보다 느리므로 numba 설치를 권장합니다.)
+#       numba는 불러오는 비용이 크므로 BULK_BATCH_SIZE 이상의 배치에서만 사용하고,
+#       작은 배치는 NumPy만으로 바로 예측합니다.
+#       예측 시에는 NumPy(+ numba)와 모델 파일(.npz, 압축 없이 저장해서 메모리 매핑)만 있으면 됩니다.
+
+import os
+import sys
+import time
+import warnings
+import numpy as np
+
+MODEL_FILE = 'apartment_sales_model_flat.npz'
+INPUT_FILE = 'apartment_sales_final_features.csv'
+BENCH_BATCH_SIZES = [1, 100, 10_000, 1_000_000]
+BULK_BATCH_SIZE = 10_000 # 이 크기 이상의 배치는 numba 커널을 쓰고, model.predict보다 빨라야 합니다.
+
+# 노드 번호 규칙: 0 이상이면 분기 노드, 음수이면 잎 노드 (잎 번호 = ~노드 번호)
+# 잎 노드는 분기 정보가 필요 없으므로 값(value)만 따로 저장합니다.
+# 분기 노드 레코드(nodes의 한 행, int32 x 4): [특성 번호, 임계값(float32 비트), 왼쪽 자식, 오른쪽 자식]
+KERNEL_GROUP_ROWS = 32 # 커널에서 트리마다 번갈아 내려보내는 행 수 (메모리 대기 시간을 겹치게 함)
+
+_kernel = None
+
+def _float32_floor(threshold):
+    """
+    float64 임계값을 넘지 않는 가장 큰 float32로 내림합니다.
+    scikit-learn은 입력을 float32로 바꾼 뒤 float64 임계값과 비교하므로,
+    이렇게 내림하면 float32끼리 비교해도 분기 결과가 정확히 같습니다.
+    """
+    thr32 = threshold.astype(np.float32)
+    over = thr32.astype(np.float64) > threshold
+    thr32[over] = np.nextafter(thr32[over], np.float32(-np.inf))
+    return thr32
+
+def _preorder(tree):
+    """
+    노드 번호를 깊이 우선(전위) 순서로 돌려줍니다. (왼쪽 자식이 부모 바로 다음에 오도록)
+    scikit-learn의 기본(깊이 우선) 빌더로 만든 트리는 이미 이 순서입니다.
+    """
+    left, right = tree.children_left, tree.children_right
+    internal = np.flatnonzero(left != -1)
+    if np.all(left[internal] == internal + 1):
+        return np.arange(tree.node_count)
+
+    order, stack = [], [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if left[node] != -1:
+            stack.append(right[node])
+            stack.append(left[node])
+    return np.asarray(order)
+
+def compile_forest(model):
+    """
+    scikit-learn 트리 앙상블을 평평한 배열 묶음(dict)으로 변환합니다.
+    - RandomForestRegressor / ExtraTreesRegressor: 트리 예측값의 평균
+    - GradientBoostingRegressor: 초기값 + 학습률 x 트리 예측값의 합
+    """
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None:
+        raise TypeError(f"지원하지 않는 모델입니다: {type(model).__name__} (학습된 트리 앙상블 필요)")
+
+    if hasattr(model, 'learning_rate'):  # Gradient Boosting
+        estimators = np.asarray(estimators).ravel()
+        if getattr(model, 'n_trees_per_iteration_', 1) != 1:
+            raise TypeError("다중 출력 Gradient Boosting 모델은 지원하지 않습니다.")
+        mode = 'sum'
+        scale = float(model.learning_rate)
+        init = getattr(model, 'init_', None)
+        if init is None or init == 'zero':
+            bias = 0.0
+        else:
+            bias = float(np.ravel(init.predict(np.zeros((1, model.n_features_in_))))[0])
+    else:
+        mode = 'mean'
+        scale = 1.0 / len(estimators)
+        bias = 0.0
+
+    nodes, value, roots = [], [], []
+    n_internal = 0
+    n_leaves = 0
+    max_depth = 0
+    for est in estimators:
+        tree = est.tree_
+        order = _preorder(tree)
+        is_leaf = tree.children_left[order] == -1
+        internal, leaves = order[~is_leaf], order[is_leaf]
+
+        # 원래 노드 번호 -> 새 번호 (분기 노드는 0부터, 잎 노드는 ~잎 번호)
+        code = np.empty(tree.node_count, dtype=np.int64)
+        code[internal] = n_internal + np.arange(len(internal))
+        code[leaves] = ~(n_leaves + np.arange(len(leaves)))
+
+        record = np.empty((len(internal), 4), dtype=np.int32)
+        record[:, 0] = tree.feature[internal]
+        record[:, 1] = _float32_floor(tree.threshold[internal]).view(np.int32)
+        record[:, 2] = code[tree.children_left[internal]]
+        record[:, 3] = code[tree.children_right[internal]]
+        nodes.append(record)
+        value.append(tree.value[leaves, 0, 0].astype(np.float64))
+        roots.append(code[0])
+
+        n_internal += len(internal)
+        n_leaves += len(leaves)
+        max_depth = max(max_depth, tree.max_depth)
+
+    feature_names = getattr(model, 'feature_names_in_', None)
+    return {
+        'nodes': np.concatenate(nodes),
+        'value': np.concatenate(value),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'scale': np.float64(scale),
+        'bias': np.float64(bias),
+        'mode': np.str_(mode),
+        'max_depth': np.int32(max_depth),
+        'feature_names': np.asarray([] if feature_names is None else list(feature_names), dtype=str),
+    }
+
+def save_flat(flat, path=MODEL_FILE):
+    # 압축하지 않아야 load_flat에서 큰 배열을 메모리 매핑할 수 있습니다.
+    np.savez(path, **flat)
+
+def load_flat(path=MODEL_FILE):
+    """
+    모델 파일을 불러옵니다. np.load는 .npz 안의 배열을 메모리 매핑하지 못하므로,
+    압축 없이 저장된 배열은 파일 안의 위치를 찾아 직접 np.memmap으로 엽니다.
+    (예측에 필요한 노드만 디스크에서 읽히므로 작은 배치는 바로 시작합니다.)
+    """
+    import zipfile
+    flat = {}
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as f:
+        for info in zf.infolist():
+            key = info.filename[:-len('.npy')]
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    flat[key] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+
+            # zip 로컬 헤더(30바이트 + 파일 이름 + 추가 필드) 다음부터 .npy 내용입니다.
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_len = int.from_bytes(local_header[26:28], 'little')
+            extra_len = int.from_bytes(local_header[28:30], 'little')
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            if len(shape) == 0 or 0 in shape:
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                flat[key] = np.lib.format.read_array(f, allow_pickle=False)
+            else:
+                flat[key] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                      order='F' if fortran_order else 'C')
+    return flat
+
+def _get_kernel():
+    """
+    numba로 컴파일한 탐색 커널(추론커널.traverse_forest)을 돌려줍니다. numba가 없으면 None.
+    (numba는 불러오는 데 시간이 걸리므로 처음 대량 배치를 예측할 때 불러옵니다.
+     컴파일 결과는 캐시되므로 두 번째 실행부터는 불러오는 시간만 듭니다.)
+    """
+    global _kernel
+    if _kernel is not None:
+        return _kernel or None
+    try:
+        from 추론커널 import traverse_forest
+    except ImportError:
+        _kernel = False
+        warnings.warn("numba가 설치되어 있지 않아 NumPy 탐색을 사용합니다. "
+                      "대량 배치에서는 model.predict와 비슷하거나 느립니다. (pip install numba)")
+        return None
+    _kernel = traverse_forest
+    return _kernel
+
+def _predict_chunk(flat, X):
+    """
+    (numba를 쓰지 않을 때) (트리, 행) 쌍을 모두 루트에서 출발시켜, 아직 잎에 도달하지 못한
+    쌍만 골라 한 단계씩 내려보냅니다. 노드 레코드(16바이트)는 한 번에 읽어 옵니다.
+    """
+    n_rows, n_features = X.shape
+    roots, nodes = flat['roots'], flat['nodes']
+
+    x_flat = X.ravel()
+    node = np.repeat(roots, n_rows)
+    row_base = np.tile(np.arange(n_rows, dtype=np.int64) * n_features, len(roots))
+    active = np.flatnonzero(node >= 0)
+
+    while active.size:
+        record = nodes[node[active]]
+        go_left = x_flat[row_base[active] + record[:, 0]] <= record[:, 1].view(np.float32)
+        nxt = np.where(go_left, record[:, 2], record[:, 3])
+        node[active] = nxt
+        active = active[nxt >= 0]
+
+    leaf_values = flat['value'][~node].reshape(len(roots), n_rows)
+    return leaf_values.sum(axis=0) * flat['scale'] + flat['bias']
+
+def predict_flat(flat, X, n_jobs=None, chunk_rows=65536, use_numba=None):
+    """
+    평평하게 변환된 모델로 예측합니다.
+    - use_numba가 None이면 BULK_BATCH_SIZE 이상의 배치에서만 numba 커널을 사용합니다.
+      (작은 배치는 numba를 불러오는 시간이 예측 시간보다 깁니다.)
+    - numba 커널은 행 묶음을 여러 코어에 나눠 처리합니다.
+    - 그 외에는 행을 chunk_rows 단위로 나눠 여러 스레드에서 NumPy로 처리합니다.
+    """
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    n_rows = X.shape[0]
+
+    if use_numba is None:
+        use_numba = n_rows >= BULK_BATCH_SIZE
+    kernel = _get_kernel() if use_numba else None
+    if kernel is not None:
+        if n_jobs:
+            import numba
+            numba.set_num_threads(min(n_jobs, numba.config.NUMBA_NUM_THREADS))
+        nodes = flat['nodes']
+        out = np.empty(n_rows)
+        kernel(nodes, nodes.view(np.float32), flat['value'], flat['roots'], X,
+               float(flat['scale']), float(flat['bias']), KERNEL_GROUP_ROWS, out)
+        return out
+
+    if n_rows <= chunk_rows:
+        return _predict_chunk(flat, X)
+
+    from concurrent.futures import ThreadPoolExecutor
+    n_jobs = n_jobs or os.cpu_count() or 1
+    starts = range(0, n_rows, chunk_rows)
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        parts = pool.map(lambda s: _predict_chunk(flat, X[s:s + chunk_rows]), starts)
+        return np.concatenate(list(parts))
+
+def score_csv(input_file, output_file, model_file=MODEL_FILE, n_jobs=None):
+    """
+    특성 CSV를 읽어 예측 매매가(만원)를 CSV로 저장합니다.
+    pandas / scikit-learn 없이 NumPy(+ numba)와 모델 파일만으로 동작합니다.
+    """
+    if not os.path.exists(model_file):
+        print(f"[오류] '{model_file}' 파일이 없습니다.")
+        print(">>> 'python 파이프라인.py train --export-model'로 먼저 모델을 저장해주세요!")
+        sys.exit(1)
+    if not os.path.exists(input_file):
+        print(f"[오류] '{input_file}' 파일이 없습니다.")
+        print(">>> '데이터분서.py'를 먼저 실행해서 특성 데이터를 준비해주세요!")
+        sys.exit(1)
+    flat = load_flat(model_file)
+    with open(input_file, encoding='utf-8-sig') as f:
+        header = f.readline().strip().split(',')
+
+    names = [str(name) for name in flat['feature_names']]
+    missing = [name for name in names if name not in header]
+    if missing:
+        raise ValueError(f"입력 파일에 필요한 특성 컬럼이 없습니다: {missing}")
+    usecols = [header.index(name) for name in names] if names else None
+
+    X = np.loadtxt(input_file, delimiter=',', skiprows=1, usecols=usecols,
+                   dtype=np.float32, encoding='utf-8-sig', ndmin=2)
+    t0 = time.perf_counter()
+    y_pred = np.expm1(predict_flat(flat, X, n_jobs=n_jobs)) # 로그 가격 -> 만원
+    elapsed = time.perf_counter() - t0
+
+    np.savetxt(output_file, y_pred, fmt='%.0f', header='예측가(만원)', comments='', encoding='utf-8-sig')
+    print(f"예측 완료: {len(y_pred):,}건, {len(y_pred) / max(elapsed, 1e-9):,.0f}건/초 -> '{output_file}'")
+    return y_pred
+
+def benchmark_inference(model, X, batch_sizes=BENCH_BATCH_SIZES, flat=None, repeat=3, seed=42):
+    """
+    배치 크기별로 기본 model.predict와 평평한 엔진의 초당 처리 행 수를 비교합니다.
+    배치는 X에서 복원 추출로 만들고, 두 결과가 오차 범위 안에서 같은지도 확인합니다.
+    BULK_BATCH_SIZE 이상의 배치에서 평평한 엔진이 더 느리면 경고하고 False를 함께 반환합니다.
+    """
+    flat = flat if flat is not None else compile_forest(model)
+    X = np.asarray(X, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    predict_flat(flat, X[:1], use_numba=True) # numba 불러오기/컴파일(첫 호출)은 측정에서 제외
+
+    engine = 'numba 커널' if _get_kernel() is not None else 'NumPy 탐색'
+    print(f"\n--- 추론 속도 비교 (행/초, 평평한 엔진: {BULK_BATCH_SIZE:,}건 이상은 {engine}, 미만은 NumPy 탐색) ---")
+    print(f" {'배치 크기':>10} | {'model.predict':>15} | {'평평한 엔진':>15} | {'배속':>6} | 최대 오차")
+    results = []
+    ok = True
+    for batch_size in batch_sizes:
+        batch = X[rng.integers(0, len(X), size=batch_size)]
+        n_repeat = repeat if batch_size < 100_000 else 1
+
+        t0 = time.perf_counter()
+        for _ in range(n_repeat):
+            expected = model.predict(batch)
+        t_stock = (time.perf_counter() - t0) / n_repeat
+
+        t0 = time.perf_counter()
+        for _ in range(n_repeat):
+            actual = predict_flat(flat, batch)
+        t_flat = (time.perf_counter() - t0) / n_repeat
+
+        max_err = float(np.max(np.abs(expected - actual)))
+        results.append((batch_size, batch_size / t_stock, batch_size / t_flat, max_err))
+        print(f" {batch_size:>10,} | {batch_size / t_stock:>15,.0f} | {batch_size / t_flat:>15,.0f} | "
+              f"{t_stock / t_flat:>5.1f}x | {max_err:.2e}")
+        if batch_size >= BULK_BATCH_SIZE and t_flat > t_stock:
+            ok = False
+            print(f"[경고] 배치 {batch_size:,}건에서 평평한 엔진이 model.predict보다 느립니다.")
+    return results, ok
+
+if __name__ == "__main__":
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+
+    # 파일 존재 여부 확인
+    if not os.path.exists(INPUT_FILE):
+        print(f"[오류] '{INPUT_FILE}' 파일이 없습니다.")
+        print(">>> '데이터분서.py'를 먼저 실행해서 학습용 데이터를 준비해주세요!")
+        sys.exit(1)
+
+    df = pd.read_csv(INPUT_FILE, encoding='utf-8-sig')
+    X = df.drop(columns=['log_거래금액']).to_numpy(dtype=np.float32)
+    y = df['log_거래금액'].to_numpy()
+
+    print("벤치마크용 모델 학습 중... (RandomForest 100그루)")
+    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1).fit(X, y)
+
+    flat = compile_forest(model)
+    print(f"변환 완료: 트리 {len(flat['roots'])}개, 분기 노드 {len(flat['nodes']):,}개, "
+          f"잎 노드 {len(flat['value']):,}개, 최대 깊이 {int(flat['max_depth'])}")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        _, ok = benchmark_inference(model, X, flat=flat)
+
+    # 대량 배치에서 기본 predict보다 느리면 실패로 종료합니다.
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+# === 5-1. 구간별 오차 분석 (Phase 5 보조) ===
+# 설명: 테스트셋의 실제가/예측가를 법정동, 연식 구간(신축/구축/재건축),
+#       층 구간, 면적 구분별로 나누어 오차 지표를 한 번에 계산하고,
+#       부트스트랩 신뢰구간을 붙여서 표(CSV)로 저장합니다.
+
+import sys
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+OUTPUT_FILE = 'apartment_sales_slice_metrics.csv'
+PROCESSED_FILE = 'apartment_sales_processed.csv'  # 법정동 이름 복원용
+
+# ----------------------------------------------------------
+# 1. 구간 정의 (모의데이터.py의 가격 결정 로직과 동일한 경계)
+# ----------------------------------------------------------
+AGE_BINS = [-np.inf, 5, 29, np.inf]
+AGE_LABELS = ['신축', '구축', '재건축']
+
+FLOOR_BINS = [-np.inf, 3, 19, np.inf]
+FLOOR_LABELS = ['저층(1~3층)', '중층(4~19층)', '고층(20층~)']
+
+AREA_BINS = [-np.inf, 60, 85, 135, np.inf]
+AREA_LABELS = ['소형(60㎡ 이하)', '중소형(60~85㎡)', '중대형(85~135㎡)', '대형(135㎡ 초과)']
+
+# 부트스트랩 속도 점검 (python 데이터오차분석.py): 100만 행 x 1,000회가 기준 시간 안에 끝나야 합니다.
+BENCH_ROWS = 1_000_000
+BENCH_BOOT = 1000
+BOOTSTRAP_BUDGET_S = 10.0
+
+# 구간별로 누적하는 합계 항목 (지표는 모두 이 합계들로부터 계산)
+# 건수, 오차, |오차|, 오차^2, |오차|/실제가, 실제가, 실제가^2
+N_SUMS = 7
+
+def load_dong_labels(processed_file=PROCESSED_FILE):
+    """
+    '법정동_인코딩' 숫자를 다시 동 이름으로 바꾸기 위한 목록을 만듭니다.
+    LabelEncoder는 정렬된 고유값 순서로 번호를 매기므로 같은 순서로 복원됩니다.
+    """
+    try:
+        dongs = pd.read_csv(processed_file, usecols=['법정동'], encoding='utf-8-sig')['법정동']
+    except (FileNotFoundError, ValueError):
+        return None
+    return np.unique(dongs.astype(str))
+
+def build_slices(X_test, dong_labels=None):
+    """
+    테스트 데이터의 각 행이 어느 구간에 속하는지 계산합니다.
+    반환값: (구분별 구간 번호 배열 목록, [(구분, 구간명), ...])
+    구간 번호는 모든 구분을 통틀어 겹치지 않도록 이어서 매깁니다.
+    """
+    n = len(X_test)
+    codes = [np.zeros(n, dtype=np.int64)]
+    names = [('전체', '전체')]
+
+    def add_dimension(dim_name, dim_codes, labels):
+        offset = len(names)
+        codes.append(dim_codes.astype(np.int64) + offset)
+        names.extend((dim_name, str(label)) for label in labels)
+
+    # (1) 법정동
+    if '법정동_인코딩' in X_test.columns:
+        dong_codes = X_test['법정동_인코딩'].to_numpy().astype(np.int64)
+        n_dong = int(dong_codes.max()) + 1 if n else 0
+        if dong_labels is not None and len(dong_labels) >= n_dong:
+            labels = list(dong_labels[:n_dong])
+        else:
+            labels = [f'법정동_{i}' for i in range(n_dong)]
+        add_dimension('법정동', dong_codes, labels)
+
+    # (2) 연식 구간 / (3) 층 구간 / (4) 면적 구분
+    for col, dim_name, bins, labels in [
+        ('아파트연식', '연식구간', AGE_BINS, AGE_LABELS),
+        ('층', '층구간', FLOOR_BINS, FLOOR_LABELS),
+        ('전용면적(㎡)', '면적구분', AREA_BINS, AREA_LABELS),
+    ]:
+        if col not in X_test.columns:
+            continue
+        dim_codes = np.digitize(X_test[col].to_numpy(dtype=float), bins[1:-1], right=True)
+        add_dimension(dim_name, dim_codes, labels)
+
+    return codes, names
+
+def _row_sums(y_true, y_pred):
+    """구간 집계에 쓰일 행 단위 항목 (n x N_SUMS)"""
+    err = y_pred - y_true
+    abs_err = np.abs(err)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.where(y_true != 0, abs_err / np.abs(y_true), 0.0)
+    return np.column_stack([
+        np.ones_like(err), err, abs_err, err * err, ape, y_true, y_true * y_true
+    ])
+
+def _metrics_from_sums(sums):
+    """
+    합계 배열(마지막 축 = N_SUMS)로부터 지표를 계산합니다.
+    점 추정(구간 x 항목)과 부트스트랩(반복 x 구간 x 항목)에 모두 사용합니다.
+    """
+    cnt, s_err, s_abs, s_sq, s_ape, s_y, s_yy = np.moveaxis(sums, -1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cnt = np.where(cnt > 0, cnt, np.nan)
+        sst = s_yy - s_y * s_y / cnt
+        return {
+            'R2': 1.0 - s_sq / np.where(sst > 0, sst, np.nan),
+            'RMSE': np.sqrt(s_sq / cnt),
+            'MAE': s_abs / cnt,
+            'MAPE(%)': 100.0 * s_ape / cnt,
+            '편향': s_err / cnt,
+        }
+
+def _poisson_table(bits=16):
+    """
+    균등 난수(uint16) -> 포아송(1) 표본 변환표. (float32, 행렬 곱에 바로 사용)
+    np.random의 포아송 생성기보다 훨씬 빠르게 대량의 가중치를 만들 수 있습니다.
+    """
+    size = 1 << bits
+    u = (np.arange(size) + 0.5) / size
+    k = np.arange(20)
+    log_fact = np.cumsum(np.log(np.maximum(k, 1)))
+    cdf = np.cumsum(np.exp(-1.0 - log_fact))
+    return np.searchsorted(cdf, u).astype(np.float32)
+
+def _sorted_segments(row_sums, codes, n_slices):
+    """
+    구분마다 행을 구간 순서로 정렬하고, 구간별 (시작, 끝) 위치를 구합니다.
+    float32 행렬 곱에서도 합계가 정확하도록 오차와 실제가는 구간 평균을 뺀 값으로 바꾸고,
+    뺀 평균(구간 x 항목)을 함께 돌려줍니다. (_bootstrap_sums에서 원래 합계로 되돌림)
+    """
+    segments = []
+    means = np.zeros((n_slices, N_SUMS))
+    for dim_codes in codes:
+        order = np.argsort(dim_codes, kind='stable')
+        sorted_codes = dim_codes[order]
+        sums = row_sums[order]
+        cnt = np.maximum(np.bincount(sorted_codes, minlength=n_slices), 1)
+        for j in (1, 5):  # 오차, 실제가
+            means[:, j] += np.bincount(sorted_codes, weights=sums[:, j], minlength=n_slices) / cnt
+        centered_err = sums[:, 1] - means[sorted_codes, 1]
+        centered_y = sums[:, 5] - means[sorted_codes, 5]
+        sums = np.column_stack([
+            sums[:, :1], centered_err, sums[:, 2:5], centered_y, centered_y * centered_y
+        ]).astype(np.float32)
+
+        slice_ids, starts = np.unique(sorted_codes, return_index=True)
+        stops = np.append(starts[1:], len(sorted_codes))
+        segments.append((sums, slice_ids, starts, stops))
+    return segments, means
+
+def _bootstrap_sums(row_sums, codes, n_slices, n_boot, seed, max_block):
+    """
+    포아송 부트스트랩: 각 행에 포아송(1) 가중치(float32)를 (행 x 반복) 블록으로 뽑고,
+    구분마다 구간 순서로 정렬한 행을 블록의 가중치 행과 짝지어
+    (블록 행 x 구간 항목 열)^T @ (블록 행 x 반복) 행렬 곱 한 번으로 모든 구분, 모든 반복의 합계를 구합니다.
+    - 블록은 max_block 원소(가중치)로 잡아 캐시 안에 머무르게 하고, 모든 구분이 같은 블록을 재사용합니다.
+    - 블록 안에서는 구분별로 걸쳐 있는 구간(대부분 1~2개)만 열로 펼치므로,
+      연산량은 행 수 x 반복 수 x 항목 수 x 구분 수로 구간(법정동 등)의 개수와 상관없습니다.
+    - 가중치는 서로 독립이므로 구분마다 정렬된 행 순서에 같은 가중치를 짝지어도
+      각 구간의 부트스트랩 분포는 달라지지 않습니다.
+    반복(resample)에 대한 파이썬 루프는 없고, 블록 합계는 float64로 누적합니다.
+    같은 seed면 블록 크기와 상관없이 결과가 같습니다. (난수를 행 순서대로 소비)
+    """
+    rng = np.random.default_rng(seed)
+    table = _poisson_table()
+    n = row_sums.shape[0]
+    segments, means = _sorted_segments(row_sums, codes, n_slices)
+    out = np.zeros((n_slices, N_SUMS, n_boot))
+    block = max(64, max_block // max(n_boot, 1) // 4 * 4)
+
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        m = stop - start
+        raw = rng.bit_generator.random_raw((m * n_boot + 3) // 4).view(np.uint16)[:m * n_boot]
+        # 변환표 크기가 정확히 2^16이라 범위를 벗어날 일이 없으므로 검사 없는(clip) take가 가장 빠릅니다.
+        weights = np.take(table, raw, mode='clip').reshape(m, n_boot)
+
+        # 블록에 걸친 (구분, 구간)마다 N_SUMS개 열: 그 구간의 행에만 값이 있고 나머지는 0
+        columns, targets = [], []
+        for sums, slice_ids, starts, stops in segments:
+            first = np.searchsorted(stops, start, side='right')
+            last = np.searchsorted(starts, stop, side='left')
+            for slice_id, lo, hi in zip(slice_ids[first:last], starts[first:last], stops[first:last]):
+                col = np.zeros((m, N_SUMS), dtype=np.float32)
+                lo, hi = max(lo, start), min(hi, stop)
+                col[lo - start:hi - start] = sums[lo:hi]
+                columns.append(col)
+                targets.append(slice_id)
+
+        block_sums = (np.hstack(columns).T @ weights).reshape(len(targets), N_SUMS, n_boot)
+        out[targets] += block_sums # 한 블록 안에서 구간은 겹치지 않음
+
+    # 구간 평균을 뺐던 항목을 원래 합계로 되돌립니다. (가중치 합 = 건수 항목)
+    cnt = out[:, 0]
+    mean_err, mean_y = means[:, 1:2], means[:, 5:6]
+    out[:, 6] += 2.0 * mean_y * out[:, 5] + mean_y * mean_y * cnt
+    out[:, 5] += mean_y * cnt
+    out[:, 1] += mean_err * cnt
+    return np.moveaxis(out, -1, 0)
+
+def evaluate_slices(X_test, y_test_origin, y_pred_origin, dong_labels=None,
+                    n_boot=1000, ci=0.95, seed=42, max_block=500_000):
+    """
+    구간별 오차 지표와 부트스트랩 신뢰구간을 계산해서 DataFrame으로 반환합니다.
+    - 점 추정: 구간 소속 행렬에 대한 한 번의 그룹 합계
+    - 신뢰구간: 포아송 가중치 부트스트랩 (n_boot회, 행렬 연산으로 일괄 처리)
+    - max_block: 한 번에 만드는 가중치 원소 수 (float32 기준 2MB 정도면 캐시 안에 머무름)
+    """
+    y_true = np.asarray(y_test_origin, dtype=np.float64)
+    y_pred = np.asarray(y_pred_origin, dtype=np.float64)
+    codes, names = build_slices(X_test, dong_labels)
+    n_slices = len(names)
+
+    row_sums = _row_sums(y_true, y_pred)
+
+    # 1. 점 추정 (모든 구분을 한 번에 집계)
+    point_sums = np.zeros((n_slices, N_SUMS))
+    for dim_codes in codes:
+        for j in range(N_SUMS):
+            point_sums[:, j] += np.bincount(dim_codes, weights=row_sums[:, j], minlength=n_slices)
+    point = _metrics_from_sums(point_sums)
+
+    table = pd.DataFrame(names, columns=['구분', '구간'])
+    table['건수'] = point_sums[:, 0].astype(np.int64)
+    for metric, values in point.items():
+        table[metric] = values
+
+    # 2. 부트스트랩 신뢰구간
+    if n_boot > 0 and len(y_true) > 0:
+        boot = _metrics_from_sums(
+            _bootstrap_sums(row_sums, codes, n_slices, n_boot, seed, max_block)
+        )
+        alpha = (1.0 - ci) / 2.0 * 100.0
+        for metric, values in boot.items():
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # 표본이 없는 구간은 NaN
+                low, high = np.nanpercentile(values, [alpha, 100.0 - alpha], axis=0)
+            table[f'{metric}_하한'] = low
+            table[f'{metric}_상한'] = high
+
+    return table[table['건수'] > 0].reset_index(drop=True)
+
+def save_slice_report(table, output_file=OUTPUT_FILE):
+    table.to_csv(output_file, index=False, encoding='utf-8-sig')
+
+    print("\n--- 구간별 오차 분석 (MAE 기준, 95% 신뢰구간) ---")
+    for _, row in table.iterrows():
+        ci_text = ''
+        if 'MAE_하한' in table.columns:
+            ci_text = f" [{row['MAE_하한']:,.0f} ~ {row['MAE_상한']:,.0f}]"
+        print(f" {row['구분']:<6} {row['구간']:<16} {row['건수']:>8,}건 | "
+              f"MAE {row['MAE']:>10,.0f} 만원{ci_text}")
+    print(f"구간별 오차 분석표 저장 완료: '{output_file}'")
+
+def benchmark_bootstrap(n_rows=BENCH_ROWS, n_boot=BENCH_BOOT, budget_s=BOOTSTRAP_BUDGET_S, seed=0):
+    """
+    모의 테스트셋(n_rows행)으로 evaluate_slices 전체 실행 시간을 재고 budget_s와 비교합니다.
+    기준 안이면 True를 함께 반환합니다.
+    """
+    rng = np.random.default_rng(seed)
+    X_test = pd.DataFrame({
+        '법정동_인코딩': rng.integers(0, 25, n_rows),
+        '아파트연식': rng.integers(0, 45, n_rows),
+        '층': rng.integers(1, 50, n_rows),
+        '전용면적(㎡)': rng.uniform(30, 200, n_rows),
+    })
+    y_true = rng.lognormal(11, 0.5, n_rows)
+    y_pred = y_true * rng.lognormal(0, 0.1, n_rows)
+
+    print(f"\n--- 구간별 오차 분석 속도 ({n_rows:,}행 x 부트스트랩 {n_boot:,}회, 기준 {budget_s}초) ---")
+    t0 = time.perf_counter()
+    table = evaluate_slices(X_test, y_true, y_pred, n_boot=n_boot)
+    elapsed = time.perf_counter() - t0
+
+    ok = elapsed <= budget_s
+    print(f" 구간 {len(table)}개 | 소요 시간 {elapsed:.1f}초 | {'통과' if ok else '초과'}")
+    if not ok:
+        print(f"[경고] 실행 시간이 기준({budget_s}초)을 넘었습니다.")
+    return elapsed, ok
+
+if __name__ == "__main__":
+    _, ok = benchmark_bootstrap()
+
+    # 기준을 넘으면 실패로 종료합니다.
+    sys.exit(0 if ok else 1)
@@ -2,36 +2,205 @@ import pandas as pd
 import numpy as np
 import sys
 import os 
+import time
 
-# 파일명 설정 (매매 데이터용)
+# 파일명 설정 (매매 / 전월세)
 INPUT_FILE = 'apartment_sales_raw_data.csv' 
 OUTPUT_FILE = 'apartment_sales_processed.csv'
+RENT_INPUT_FILE = 'apartment_rent_raw_data.csv'
+RENT_OUTPUT_FILE = 'apartment_rent_processed.csv'
+CHUNK_SIZE = 100000 # 원본을 나눠 읽는 단위 (메모리 절약)
 
-def preprocess_data(df):
-    print("--- 매매 데이터 전처리 시작 ---")
+# 월세 -> 보증금 환산 전환율 (연 4.5%, 모의데이터.py와 동일)
+RENT_CONVERSION_RATE = 0.045
+
+# 거래 유형별 스키마
+# 유형마다 다른 부분(금액 컬럼, 중복 판단 컬럼, 최종 컬럼)만 여기에 정의하고,
+# 변환 코드는 하나로 두어 두 유형을 한 번에 처리합니다.
+COMMON_COLS = ['아파트', '법정동', '전용면적(㎡)', '층', '건축년도', '아파트연식']
+SCHEMAS = {
+    '매매': {
+        'input_file': INPUT_FILE,
+        'output_file': OUTPUT_FILE,
+        # 원본 금액 컬럼 -> 변환된 컬럼 (콤마 포함 문자열 -> 정수, 만원)
+        'money_cols': {'거래금액': '거래금액(만원)'},
+        # 같은 아파트/층/면적/계약일자/금액의 거래는 재신고 또는 취소 후 재등록으로 보고 1건만 남깁니다.
+        'dedup_cols': ['아파트', '층', '전용면적(㎡)', '계약일자', '거래금액(만원)'],
+        # 이상 거래 판단용 가격 = 컬럼 x 가중치의 합
+        'price_weights': {'거래금액(만원)': 1.0},
+        'final_cols': COMMON_COLS + ['거래금액(만원)', '계약일자', '이상거래'],
+    },
+    '전월세': {
+        'input_file': RENT_INPUT_FILE,
+        'output_file': RENT_OUTPUT_FILE,
+        'money_cols': {'보증금액': '보증금(만원)', '월세금액': '월세(만원)'},
+        'dedup_cols': ['아파트', '층', '전용면적(㎡)', '계약일자', '보증금(만원)', '월세(만원)'],
+        # 월세는 보증금으로 환산해서 전세와 같은 기준으로 비교합니다.
+        'price_weights': {'보증금(만원)': 1.0, '월세(만원)': 12 / RENT_CONVERSION_RATE},
+        'final_cols': COMMON_COLS + ['전월세구분', '보증금(만원)', '월세(만원)', '계약일자', '이상거래'],
+    },
+}
+
+# 중복 거래 선별 설정
+SEEN_CAPACITY = 10000000   # 기억할 수 있는 거래 수 (블룸 필터 크기 결정)
+SEEN_FP_RATE = 1e-6        # 새 거래를 중복으로 잘못 판단할 확률
+
+# 이상 거래 판단 설정 (거래유형/법정동별 ㎡당 가격의 중위수/MAD 기준)
+OUTLIER_Z = 3.5
+LOG_PRICE_BINS = np.linspace(np.log(10), np.log(100000), 1001) # log(만원/㎡) 구간
+
+def create_screen_state(capacity=SEEN_CAPACITY, fp_rate=SEEN_FP_RATE):
+    """
+    청크 단위 선별에 필요한 상태를 만듭니다.
+    - 이미 본 거래: 블룸 필터 (capacity와 상관없이 메모리 사용량 고정)
+    - 거래유형/법정동별 ㎡당 가격 분포: 고정 구간 히스토그램
+    - 거래유형별 처리 건수와 유형별 작업(분리 + 저장) 시간, 두 유형을 함께 처리하는 공통 처리 시간
+    """
+    n_bits = int(np.ceil(-capacity * np.log(fp_rate) / np.log(2) ** 2))
+    n_hashes = max(1, int(round(n_bits / capacity * np.log(2))))
+    return {
+        'bits': np.zeros((n_bits + 7) // 8, dtype=np.uint8),
+        'n_bits': n_bits,
+        'n_hashes': n_hashes,
+        'capacity': capacity,
+        'dong_index': {},
+        'hist': np.zeros((0, len(LOG_PRICE_BINS) - 1), dtype=np.int64),
+        'counts': {t: {'n_input': 0, 'n_duplicate': 0, 'n_outlier': 0, 'elapsed': 0.0} for t in SCHEMAS},
+        'n_seen': 0,
+        'elapsed': 0.0,
+    }
+
+def _bloom_positions(hashes, n_bits, n_hashes):
+    # 이중 해싱: i번째 위치 = h1 + i * h2 (mod n_bits)
+    h1 = hashes
+    h2 = (hashes * np.uint64(0x9E3779B97F4A7C15)) ^ (hashes >> np.uint64(29)) | np.uint64(1)
+    i = np.arange(n_hashes, dtype=np.uint64)
+    return (h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(n_bits)
+
+def _robust_stats(hist):
+    """히스토그램으로부터 법정동별 중위수와 MAD(중위 절대 편차)를 구합니다."""
+    centers = (LOG_PRICE_BINS[:-1] + LOG_PRICE_BINS[1:]) / 2
+    bin_width = LOG_PRICE_BINS[1] - LOG_PRICE_BINS[0]
+    half = hist.sum(axis=1, keepdims=True) / 2
+
+    median = centers[np.argmax(hist.cumsum(axis=1) >= half, axis=1)]
+
+    dev = np.abs(centers[None, :] - median[:, None])
+    order = np.argsort(dev, axis=1)
+    sorted_dev = np.take_along_axis(dev, order, axis=1)
+    sorted_cnt = np.take_along_axis(hist, order, axis=1)
+    mad = sorted_dev[np.arange(len(hist)), np.argmax(sorted_cnt.cumsum(axis=1) >= half, axis=1)]
+    return median, np.maximum(mad, bin_width)
+
+def screen_transactions(proc_df, state, key_cols, price, groups):
+    """
+    한 번의 처리로 중복 거래를 제거하고 ㎡당 가격 이상 거래를 표시합니다.
+    1) key_cols 묶음을 64비트 해시로 변환 -> 청크 내부 중복 + 이전 청크(블룸 필터) 중복 제거
+    2) 남은 거래로 그룹(groups)별 히스토그램을 갱신하고, 중위수/MAD 기준 robust z-score로 '이상거래' 표시
+    여러 청크로 나눠 처리할 때는 지금까지 누적된 분포를 기준으로 판단합니다.
+    """
+    # 1. 중복 제거
+    hashes = pd.util.hash_pandas_object(proc_df[key_cols], index=False).to_numpy()
+    positions = _bloom_positions(hashes, state['n_bits'], state['n_hashes'])
+    byte_idx = (positions >> np.uint64(3)).astype(np.int64)
+    bit_mask = (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+
+    in_chunk_dup = pd.Series(hashes).duplicated().to_numpy()
+    seen_before = ((state['bits'][byte_idx] & bit_mask) != 0).all(axis=1)
+    keep = ~(in_chunk_dup | seen_before)
+    np.bitwise_or.at(state['bits'], byte_idx[keep].ravel(), bit_mask[keep].ravel())
+
+    state['n_seen'] += int(keep.sum())
+    proc_df = proc_df[keep].copy()
+    price = np.asarray(price, dtype=float)[keep]
+    groups = np.asarray(groups)[keep]
+
+    # 2. 이상 거래 표시 (그룹별 ㎡당 가격)
+    proc_df['이상거래'] = False
+    if len(proc_df):
+        for group in pd.unique(groups):
+            state['dong_index'].setdefault(group, len(state['dong_index']))
+        n_dong = len(state['dong_index'])
+        if len(state['hist']) < n_dong:
+            grow = np.zeros((n_dong - len(state['hist']), state['hist'].shape[1]), dtype=np.int64)
+            state['hist'] = np.vstack([state['hist'], grow])
+
+        codes = pd.Series(groups).map(state['dong_index']).to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_ppa = np.log(price / proc_df['전용면적(㎡)'].to_numpy(dtype=float))
+        n_bins = len(LOG_PRICE_BINS) - 1
+        bins = np.clip(np.searchsorted(LOG_PRICE_BINS, log_ppa, side='right') - 1, 0, n_bins - 1)
+        state['hist'] += np.bincount(codes * n_bins + bins, minlength=n_dong * n_bins).reshape(n_dong, n_bins)
+
+        median, mad = _robust_stats(state['hist'])
+        robust_z = 0.6745 * (log_ppa - median[codes]) / mad[codes]
+        proc_df['이상거래'] = np.abs(robust_z) > OUTLIER_Z
+
+    return proc_df
+
+def report_screening(state):
+    elapsed = state['elapsed']
+    print("\n--- 중복/이상 거래 선별 결과 (거래유형별) ---")
+    total = 0
+    total_elapsed = elapsed
+    for trade_type, counts in state['counts'].items():
+        if counts['n_input'] == 0:
+            continue
+        total += counts['n_input']
+        total_elapsed += counts['elapsed']
+        # 유형별 처리 속도는 해당 유형만의 작업(분리, __main__에서는 저장 포함) 시간 기준입니다.
+        n_kept = counts['n_input'] - counts['n_duplicate']
+        throughput = n_kept / counts['elapsed'] if counts['elapsed'] > 0 else float('inf')
+        print(f"[{trade_type}] 입력 {counts['n_input']}건 | 중복 제거 {counts['n_duplicate']}건 | "
+              f"이상 거래 표시 {counts['n_outlier']}건 | 유형별 처리 {counts['elapsed']:.2f}초, "
+              f"{throughput:,.0f}건/초")
+    # 변환과 선별은 두 유형을 한 번에 처리하므로 공통 처리 시간으로 따로 표시합니다.
+    throughput = total / elapsed if elapsed > 0 else float('inf')
+    print(f"[공통 처리] 입력 {total}건 | 처리 시간 {elapsed:.2f}초 | 처리 속도 {throughput:,.0f}건/초")
+    throughput = total / total_elapsed if total_elapsed > 0 else float('inf')
+    print(f"[전체] 입력 {total}건 | 처리 시간 {total_elapsed:.2f}초 | 처리 속도 {throughput:,.0f}건/초")
+    if state['n_seen'] > state['capacity']:
+        print(f"[주의] 기억한 거래 수({state['n_seen']}건)가 SEEN_CAPACITY를 넘어 중복 오판 확률이 높아졌습니다.")
+
+def infer_trade_type(df):
+    """'거래유형' 컬럼이 없는 원본은 금액 컬럼을 보고 매매/전월세를 판단합니다."""
+    for trade_type, schema in SCHEMAS.items():
+        if any(col in df.columns for col in schema['money_cols']):
+            return trade_type
+    return '매매'
+
+def transform_transactions(df, screen_state):
+    """
+    매매 + 전월세가 섞인 원본을 한 번에 변환하는 공통 처리 단계입니다.
+    모든 변환은 거래유형과 상관없이 컬럼 단위 벡터 연산으로 수행하고,
+    유형별 차이는 SCHEMAS 정의만 참고합니다. (반환값에는 '거래유형' 컬럼 포함)
+    """
+    start = time.perf_counter()
     proc_df = df.copy()
+    if '거래유형' not in proc_df.columns:
+        proc_df['거래유형'] = infer_trade_type(proc_df)
     
     # 1. 컬럼명 변경 (안전장치)
     # 모의데이터 생성기에 따라 '단지명'으로 생성될 수도 있으므로 '아파트'로 통일합니다.
     if '단지명' in proc_df.columns:
         proc_df = proc_df.rename(columns={'단지명': '아파트'})
     
-    # 2. 금액 데이터 숫자 변환 ('거래금액' 콤마 제거)
-    # 문자열 "1,000,000" -> 정수 1000000 변환
-    if '거래금액' in proc_df.columns:
-        proc_df['거래금액(만원)'] = proc_df['거래금액'].astype(str).str.replace(',', '').str.strip().astype(int)
+    # 2. 금액 데이터 숫자 변환 (콤마 제거)
+    # 문자열 "1,000,000" -> 숫자 1000000 변환 (다른 유형의 행은 NaN)
+    for schema in SCHEMAS.values():
+        for raw_col, money_col in schema['money_cols'].items():
+            if raw_col in proc_df.columns:
+                proc_df[money_col] = pd.to_numeric(
+                    proc_df[raw_col].astype(str).str.replace(',', '').str.strip(), errors='coerce')
     
     # 3. 면적 데이터 변환
     proc_df['전용면적(㎡)'] = proc_df['전용면적'].astype(float)
     
-    # 4. 결측치 처리 (중위값으로 대체)
-    if '건축년도' in proc_df.columns:
-        median_build_year = proc_df['건축년도'].median()
-        proc_df['건축년도'] = proc_df['건축년도'].fillna(median_build_year)
-    
-    if '층' in proc_df.columns:
-        median_floor = proc_df['층'].median()
-        proc_df['층'] = proc_df['층'].fillna(median_floor)
+    # 4. 결측치 처리 (거래유형별 중위값으로 대체)
+    for col in ['건축년도', '층']:
+        if col in proc_df.columns:
+            median_by_type = proc_df.groupby('거래유형')[col].transform('median')
+            proc_df[col] = proc_df[col].fillna(median_by_type)
     
     # 5. 파생변수 생성
     # 날짜 합치기 (년-월-일 -> 계약일자)
@@ -42,39 +211,155 @@ def preprocess_data(df):
     # 아파트 연식 계산 (거래년도 - 건축년도)
     proc_df['아파트연식'] = proc_df['년'].astype(int) - proc_df['건축년도'].astype(int)
     
-    # 6. 최종 컬럼 선택
-    # 분석 및 학습에 필요한 핵심 컬럼만 남깁니다.
-    final_cols = [
-        '아파트', '법정동', '전용면적(㎡)', '층', '건축년도', 
-        '아파트연식', '거래금액(만원)', '계약일자'
-    ]
-    
-    # 실제 존재하는 컬럼만 선택 (오류 방지)
-    available_cols = [c for c in final_cols if c in proc_df.columns]
-    proc_df = proc_df[available_cols]
+    # 전월세 구분 (월세가 0이면 전세)
+    trade_types = proc_df['거래유형'].to_numpy()
+    if '월세(만원)' in proc_df.columns:
+        rent_kind = np.where(proc_df['월세(만원)'].fillna(0).to_numpy() > 0, '월세', '전세')
+        proc_df['전월세구분'] = pd.Series(rent_kind, index=proc_df.index).where(trade_types == '전월세')
     
-    print("\n--- 전처리 완료 ---")
+    # 6. 중복 거래 제거 및 이상 거래 표시
+    # 중복 판단 컬럼은 모든 유형의 합집합 + 거래유형 (다른 유형의 금액 컬럼은 NaN이라 영향 없음)
+    key_cols = ['거래유형']
+    price = np.full(len(proc_df), np.nan)
+    for trade_type, schema in SCHEMAS.items():
+        key_cols += [c for c in schema['dedup_cols'] if c in proc_df.columns and c not in key_cols]
+        weights = {c: w for c, w in schema['price_weights'].items() if c in proc_df.columns}
+        if weights:
+            type_price = sum(proc_df[c].fillna(0).to_numpy(dtype=float) * w for c, w in weights.items())
+            price = np.where(trade_types == trade_type, type_price, price)
+    groups = proc_df['거래유형'].astype(str) + '|' + proc_df['법정동'].astype(str)
+
+    n_input = proc_df['거래유형'].value_counts()
+    proc_df = screen_transactions(proc_df, screen_state, key_cols, price, groups.to_numpy())
+    n_kept = proc_df['거래유형'].value_counts()
+    n_outlier = proc_df.loc[proc_df['이상거래'], '거래유형'].value_counts()
+    for trade_type, n in n_input.items():
+        counts = screen_state['counts'].setdefault(trade_type, {'n_input': 0, 'n_duplicate': 0, 'n_outlier': 0, 'elapsed': 0.0})
+        counts['n_input'] += int(n)
+        counts['n_duplicate'] += int(n - n_kept.get(trade_type, 0))
+        counts['n_outlier'] += int(n_outlier.get(trade_type, 0))
+
+    screen_state['elapsed'] += time.perf_counter() - start
     return proc_df
 
+def split_by_type(proc_df, screen_state=None):
+    """
+    공통 처리 결과를 거래유형별 최종 컬럼으로 나눕니다. {거래유형: DataFrame}
+    screen_state를 넘기면 유형별로 걸린 시간을 기록합니다.
+    """
+    result = {}
+    for trade_type, schema in SCHEMAS.items():
+        start = time.perf_counter()
+        part = proc_df[proc_df['거래유형'] == trade_type]
+        if part.empty:
+            continue
+        # 실제 존재하는 컬럼만 선택 (오류 방지)
+        available_cols = [c for c in schema['final_cols'] if c in part.columns]
+        part = part[available_cols].copy()
+        for money_col in schema['money_cols'].values():
+            if money_col in part.columns:
+                part[money_col] = part[money_col].astype('Int64')
+        result[trade_type] = part
+        if screen_state is not None:
+            screen_state['counts'][trade_type]['elapsed'] += time.perf_counter() - start
+    return result
+
+def preprocess_feed(df, screen_state=None, verbose=True):
+    """
+    매매 / 전월세 원본(또는 '거래유형' 컬럼으로 둘을 합친 원본)을 전처리해서
+    {거래유형: 전처리된 DataFrame} 형태로 반환합니다.
+    여러 청크를 나눠 처리할 때는 같은 screen_state를 계속 넘겨줍니다.
+    """
+    if verbose:
+        print("--- 매매/전월세 데이터 전처리 시작 ---")
+
+    single_pass = screen_state is None
+    if single_pass:
+        screen_state = create_screen_state()
+    proc_df = transform_transactions(df, screen_state)
+
+    # 분석 및 학습에 필요한 핵심 컬럼만 남깁니다.
+    result = split_by_type(proc_df, screen_state)
+    if single_pass and verbose:
+        report_screening(screen_state)
+    
+    if verbose:
+        print("\n--- 전처리 완료 ---")
+    return result
+
+def preprocess_data(df, screen_state=None, verbose=True):
+    """
+    한 가지 거래유형(매매 또는 전월세) 원본을 전처리해서 DataFrame으로 반환합니다.
+    두 유형이 섞인 원본은 preprocess_feed()를 사용합니다.
+    """
+    if '거래유형' in df.columns:
+        trade_types = df['거래유형'].dropna().unique()
+        if len(trade_types) > 1:
+            raise ValueError(f"여러 거래유형이 섞인 데이터입니다: {list(trade_types)}. preprocess_feed()를 사용하세요.")
+        trade_type = trade_types[0] if len(trade_types) else infer_trade_type(df)
+    else:
+        trade_type = infer_trade_type(df)
+
+    result = preprocess_feed(df, screen_state=screen_state, verbose=verbose)
+    if trade_type in result:
+        return result[trade_type]
+    # 모든 행이 중복으로 제거된 경우에도 같은 컬럼의 빈 DataFrame을 돌려줍니다.
+    return pd.DataFrame(columns=SCHEMAS[trade_type]['final_cols'])
+
+def read_combined_feed(input_files, chunksize=CHUNK_SIZE):
+    """
+    거래유형별 원본 파일을 CHUNK_SIZE 단위로 읽어, '거래유형' 컬럼을 붙인
+    하나의 통합 청크로 합쳐서 차례로 돌려줍니다.
+    """
+    readers = {t: pd.read_csv(path, encoding='utf-8-sig', chunksize=chunksize)
+               for t, path in input_files.items()}
+    while readers:
+        parts = []
+        for trade_type in list(readers):
+            chunk = next(readers[trade_type], None)
+            if chunk is None:
+                del readers[trade_type]
+                continue
+            parts.append(chunk.assign(거래유형=trade_type))
+        if parts:
+            yield pd.concat(parts, ignore_index=True)
+
 if __name__ == "__main__":
     # 파일 존재 여부 확인
-    if not os.path.exists(INPUT_FILE):
-        print(f"[오류] '{INPUT_FILE}' 파일이 없습니다.")
-        print(" 먼저 '모의데이터.py'를 실행하여 매매 데이터를 생성해주세요.")
+    input_files = {t: schema['input_file'] for t, schema in SCHEMAS.items()
+                   if os.path.exists(schema['input_file'])}
+    if not input_files:
+        print(f"[오류] '{INPUT_FILE}', '{RENT_INPUT_FILE}' 파일이 없습니다.")
+        print(" 먼저 '모의데이터.py'를 실행하여 매매/전월세 데이터를 생성해주세요.")
         sys.exit(1)
+    for trade_type, schema in SCHEMAS.items():
+        if trade_type not in input_files:
+            print(f"[알림] '{schema['input_file']}' 파일이 없어 {trade_type} 데이터는 건너뜁니다.")
         
-    # 데이터 로드
-    raw_df = pd.read_csv(INPUT_FILE, encoding='utf-8-sig')
-    print(f"원본 데이터 로드 성공: {len(raw_df)}건")
-    
-    # 전처리 수행
-    processed_df = preprocess_data(raw_df)
+    # 매매 + 전월세 원본을 하나의 통합 스트림으로 읽으면서 한 번에 전처리/선별하고,
+    # 결과는 거래유형별 파일에 바로 이어서 저장합니다.
+    print("--- 매매/전월세 데이터 전처리 시작 ---")
+    screen_state = create_screen_state()
+    samples = {}
+    n_saved = {}
+    for chunk in read_combined_feed(input_files):
+        for trade_type, processed_df in preprocess_feed(chunk, screen_state=screen_state, verbose=False).items():
+            output_file = SCHEMAS[trade_type]['output_file']
+            first = trade_type not in n_saved
 
-    # 결과 저장
-    processed_df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8-sig')
-    print(f"전처리 데이터 저장 완료: '{OUTPUT_FILE}'")
+            # 결과 저장 (첫 청크는 헤더와 함께 새로 쓰고, 이후 청크는 이어 붙임)
+            start = time.perf_counter()
+            processed_df.to_csv(output_file, mode='w' if first else 'a', header=first,
+                                index=False, encoding='utf-8-sig' if first else 'utf-8')
+            screen_state['counts'][trade_type]['elapsed'] += time.perf_counter() - start
+            n_saved[trade_type] = n_saved.get(trade_type, 0) + len(processed_df)
+            samples.setdefault(trade_type, processed_df.head())
+
+    report_screening(screen_state)
+    print("\n--- 전처리 완료 ---")
+    for trade_type, n in n_saved.items():
+        print(f"[{trade_type}] 전처리 데이터 저장 완료: '{SCHEMAS[trade_type]['output_file']}' ({n}건)")
     
-    print("\n--- 결과 데이터 요약 ---")
-    processed_df.info()
-    print("\n--- 데이터 샘플 ---")
-    print(processed_df.head())
\ No newline at end of file
+    for trade_type, sample_df in samples.items():
+        print(f"\n--- [{trade_type}] 데이터 샘플 ---")
+        print(sample_df)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# === 5-2. 순열 중요도 분석 (Phase 5 보조) ===
+# 설명: 불순도 기반 중요도(feature_importances_)는 '아파트_인코딩'처럼
+#       값의 종류가 많은 컬럼을 과대평가하는 경향이 있습니다.
+#       특성 값을 섞었을 때 성능이 얼마나 떨어지는지(순열 중요도)를
+#       층화 표본 위에서 병렬로 계산해서 함께 비교합니다.
+
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import r2_score
+
+STRATA_COL = '법정동_인코딩'
+
+def stratified_subsample(X, y, sample_size=20000, strata_col=STRATA_COL, seed=42):
+    """
+    법정동 비율을 유지한 채로 테스트 데이터에서 표본을 뽑습니다.
+    데이터가 sample_size보다 작으면 전체를 그대로 사용합니다.
+    """
+    if sample_size is None or len(X) <= sample_size:
+        return X, y
+
+    frac = sample_size / len(X)
+    if strata_col in X.columns:
+        sample_index = (X.groupby(strata_col, group_keys=False)
+                         .sample(frac=frac, random_state=seed).index)
+    else:
+        sample_index = X.sample(n=sample_size, random_state=seed).index
+    return X.loc[sample_index], y.loc[sample_index]
+
+def _permuted_score(model, X, y, col, seed):
+    """특성 하나(col)를 섞은 뒤의 R2 점수"""
+    rng = np.random.default_rng(seed)
+    X_perm = X.copy()
+    X_perm[col] = rng.permutation(X_perm[col].to_numpy())
+    return r2_score(y, model.predict(X_perm))
+
+def compute_permutation_importance(model, X_test, y_test, n_repeats=5, sample_size=20000,
+                                   time_budget=60.0, n_jobs=-1, seed=42):
+    """
+    순열 중요도 = (원래 R2) - (특성을 섞은 뒤 R2), 로그 가격 스케일 기준.
+    - 특성 x 반복 작업을 스레드 병렬로 실행합니다. (트리 예측은 GIL을 풀고 동작)
+    - 반복은 한 회차씩 진행하며, 다음 회차가 time_budget(초)을 넘길 것 같으면 멈춥니다.
+      (최소 1회차는 항상 수행)
+    """
+    X_sample, y_sample = stratified_subsample(X_test, y_test, sample_size, seed=seed)
+    columns = list(X_sample.columns)
+
+    # 작업 자체를 병렬로 돌리므로 모델 내부 병렬은 꺼서 과도한 스레드 생성을 막습니다.
+    original_n_jobs = getattr(model, 'n_jobs', None)
+    if original_n_jobs is not None:
+        model.n_jobs = 1
+
+    start = time.perf_counter()
+    drops = {col: [] for col in columns}
+    try:
+        baseline = r2_score(y_sample, model.predict(X_sample))
+        with Parallel(n_jobs=n_jobs, prefer='threads') as parallel:
+            for repeat in range(n_repeats):
+                round_start = time.perf_counter()
+                scores = parallel(
+                    delayed(_permuted_score)(model, X_sample, y_sample, col, seed + repeat * len(columns) + i)
+                    for i, col in enumerate(columns)
+                )
+                for col, score in zip(columns, scores):
+                    drops[col].append(baseline - score)
+
+                elapsed = time.perf_counter() - start
+                round_time = time.perf_counter() - round_start
+                if time_budget is not None and elapsed + round_time > time_budget:
+                    break
+    finally:
+        if original_n_jobs is not None:
+            model.n_jobs = original_n_jobs
+
+    n_done = len(drops[columns[0]]) if columns else 0
+    print(f"  > 순열 중요도 계산 완료: 표본 {len(X_sample)}건, "
+          f"{n_done}회 반복, {time.perf_counter() - start:.1f}초 소요")
+
+    return pd.DataFrame({
+        'feature': columns,
+        'importance': [np.mean(drops[col]) for col in columns],
+        'std': [np.std(drops[col]) for col in columns],
+    }).sort_values(by='importance', ascending=False).reset_index(drop=True)
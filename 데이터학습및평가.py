@@ -3,35 +3,53 @@
 # 설명: 최종 데이터셋을 사용하여 머신러닝 모델(Random Forest)을 학습시키고,
 #       실제 아파트 매매가를 예측하여 성능을 평가합니다.
 
+# matplotlib / seaborn / scikit-learn은 불러오는 데 시간이 오래 걸리므로,
+# 모듈 맨 위가 아니라 실제로 학습하거나 그래프를 그리는 함수 안에서 불러옵니다.
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 import platform
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-from sklearn.ensemble import RandomForestRegressor
+from 고속추론 import MODEL_FILE, compile_forest, save_flat
+from 데이터오차분석 import evaluate_slices, load_dong_labels, save_slice_report
 
 # ----------------------------------------------------------
 # 1. 한글 폰트 설정 (Mac/Windows 호환)
 # ----------------------------------------------------------
-system_name = platform.system()
-if system_name == 'Darwin': # Mac
-    plt.rcParams['font.family'] = 'AppleGothic'
-elif system_name == 'Windows': # Windows
-    plt.rcParams['font.family'] = 'Malgun Gothic'
-else: # Linux (Colab 등)
-    plt.rcParams['font.family'] = 'NanumGothic'
+def setup_korean_font():
+    """matplotlib을 불러오고 한글 폰트를 설정합니다. (그래프를 그릴 때만 호출)"""
+    import matplotlib.pyplot as plt
 
-plt.rcParams['axes.unicode_minus'] = False # 마이너스 부호 깨짐 방지
+    system_name = platform.system()
+    if system_name == 'Darwin': # Mac
+        plt.rcParams['font.family'] = 'AppleGothic'
+    elif system_name == 'Windows': # Windows
+        plt.rcParams['font.family'] = 'Malgun Gothic'
+    else: # Linux (Colab 등)
+        plt.rcParams['font.family'] = 'NanumGothic'
+
+    plt.rcParams['axes.unicode_minus'] = False # 마이너스 부호 깨짐 방지
+    return plt
 
 # ----------------------------------------------------------
 # 2. 설정 및 데이터 로드
 # ----------------------------------------------------------
 INPUT_FILE = 'apartment_sales_final_features.csv'
+IMPORTANCE_FIG_FILE = 'feature_importance_comparison.png'
+
+# 순열 중요도 설정 (층화 표본 크기, 반복 횟수, 시간 제한(초))
+USE_PERMUTATION_IMPORTANCE = True
+PERM_SAMPLE_SIZE = 20000
+PERM_N_REPEATS = 5
+PERM_TIME_BUDGET = 60.0
+
+# 고속 추론용 모델 파일 저장 여부 (예측(score)을 할 때만 필요하므로 기본은 저장하지 않음)
+EXPORT_FLAT_MODEL = False
+
+def train_and_evaluate(export_model=EXPORT_FLAT_MODEL):
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+    from sklearn.ensemble import RandomForestRegressor
 
-def train_and_evaluate():
     print("--- 매매가 예측 모델 학습 시작 ---")
 
     # 파일 존재 여부 확인
@@ -72,6 +90,11 @@ def train_and_evaluate():
     
     print("모델 학습 완료!")
 
+    # 고속 추론용 모델 파일 저장 (트리를 평평한 배열로 변환, 메모리 매핑할 수 있도록 압축 없이 저장)
+    if export_model:
+        save_flat(compile_forest(model), MODEL_FILE)
+        print(f"고속 추론용 모델 저장 완료: '{MODEL_FILE}'")
+
     # ----------------------------------------------------------
     # 5. 예측 및 평가
     # ----------------------------------------------------------
@@ -98,10 +121,17 @@ def train_and_evaluate():
     print(f"       약 {mae/10000:.2f}억 원 ({mae:,.0f}만원) 정도 차이가 납니다.")
     print("="*50)
 
+    # 구간별 오차 분석 (법정동 / 연식 / 층 / 면적 구분 + 부트스트랩 신뢰구간)
+    slice_table = evaluate_slices(X_test, y_test_origin, y_pred_origin,
+                                  dong_labels=load_dong_labels())
+    save_slice_report(slice_table)
+
     # ----------------------------------------------------------
     # 6. 시각화 (결과 분석)
     # ----------------------------------------------------------
-    
+    import seaborn as sns
+    plt = setup_korean_font()
+
     # (1) 실제값 vs 예측값 산점도
     plt.figure(figsize=(10, 6))
     sns.scatterplot(x=y_test_origin, y=y_pred_origin, alpha=0.6, color='#4c72b0')
@@ -121,18 +151,53 @@ def train_and_evaluate():
 
     # (2) 특성 중요도 (Feature Importance)
     # 어떤 변수가 집값 결정에 가장 큰 영향을 미쳤는지 확인
+    # 불순도 기반 중요도와 순열 중요도를 나란히 비교합니다.
     feature_importance = pd.DataFrame({
         'feature': X.columns,
         'importance': model.feature_importances_
     }).sort_values(by='importance', ascending=False)
 
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x='importance', y='feature', data=feature_importance, palette='viridis')
-    plt.title('아파트 집값 결정 중요 요인 (Feature Importance)', fontsize=14)
-    plt.xlabel('중요도', fontsize=12)
-    plt.ylabel('요인(Feature)', fontsize=12)
-    plt.grid(axis='x', alpha=0.3)
-    plt.tight_layout()
+    permutation_importance = None
+    if USE_PERMUTATION_IMPORTANCE:
+        from 데이터중요도분석 import compute_permutation_importance
+        print("\n[순열 중요도 계산 중...]")
+        permutation_importance = compute_permutation_importance(
+            model, X_test, y_test,
+            n_repeats=PERM_N_REPEATS,
+            sample_size=PERM_SAMPLE_SIZE,
+            time_budget=PERM_TIME_BUDGET,
+        )
+
+    plot_feature_importance(feature_importance, permutation_importance)
+
+def plot_feature_importance(feature_importance, permutation_importance=None):
+    import seaborn as sns
+    plt = setup_korean_font()
+
+    n_panels = 1 if permutation_importance is None else 2
+    fig, axes = plt.subplots(1, n_panels, figsize=(10 * n_panels, 6), squeeze=False)
+
+    ax = axes[0][0]
+    sns.barplot(x='importance', y='feature', data=feature_importance, palette='viridis', ax=ax)
+    ax.set_title('불순도 기반 중요도 (Feature Importance)', fontsize=14)
+    ax.set_xlabel('중요도', fontsize=12)
+    ax.set_ylabel('요인(Feature)', fontsize=12)
+    ax.grid(axis='x', alpha=0.3)
+
+    if permutation_importance is not None:
+        ax = axes[0][1]
+        sns.barplot(x='importance', y='feature', data=permutation_importance, palette='magma', ax=ax)
+        ax.errorbar(permutation_importance['importance'], np.arange(len(permutation_importance)),
+                    xerr=permutation_importance['std'], fmt='none', ecolor='black', capsize=3)
+        ax.set_title('순열 중요도 (Permutation Importance, R2 감소량)', fontsize=14)
+        ax.set_xlabel('R2 감소량', fontsize=12)
+        ax.set_ylabel('')
+        ax.grid(axis='x', alpha=0.3)
+
+    fig.suptitle('아파트 집값 결정 중요 요인', fontsize=16)
+    fig.tight_layout()
+    fig.savefig(IMPORTANCE_FIG_FILE, dpi=150)
+    print(f"특성 중요도 비교 차트 저장 완료: '{IMPORTANCE_FIG_FILE}'")
     plt.show()
 
 if __name__ == "__main__":
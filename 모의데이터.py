@@ -6,25 +6,30 @@ import os
 # --- 설정값 ---
 NUM_ROWS = 200000
 OUTPUT_FILENAME = 'apartment_sales_raw_data.csv' # 매매 데이터용 파일명
+NUM_RENT_ROWS = 100000
+RENT_OUTPUT_FILENAME = 'apartment_rent_raw_data.csv' # 전월세 데이터용 파일명
+
+# 1. 지역 및 입지 가중치 (강남구 주요 동네)
+DISTRICTS = {
+    '압구정동': 2.5, # 재건축 대장주 (가장 비쌈)
+    '반포동': 2.3,   # 한강변 신축
+    '대치동': 2.0,   # 학군 프리미엄
+    '삼성동': 1.8,   # 개발 호재
+    '도곡동': 1.6,   # 전통 부촌
+    '역삼동': 1.3,   # 업무 지구
+    '개포동': 1.4    # 신축 대단지
+}
+
+# 아파트 브랜드
+APT_BRANDS = ['현대', '래미안', '자이', '힐스테이트', '아이파크', '푸르지오', '더샵', 'e편한세상', '아크로', '롯데캐슬']
 
 def create_realistic_sales_data(num_rows=200000):
     """
     아파트 '매매' 실거래가를 모방한 데이터 생성
     (강남구 실제 시세 및 프리미엄 로직 반영)
     """
-    # 1. 지역 및 입지 가중치 (강남구 주요 동네)
-    districts = {
-        '압구정동': 2.5, # 재건축 대장주 (가장 비쌈)
-        '반포동': 2.3,   # 한강변 신축
-        '대치동': 2.0,   # 학군 프리미엄
-        '삼성동': 1.8,   # 개발 호재
-        '도곡동': 1.6,   # 전통 부촌
-        '역삼동': 1.3,   # 업무 지구
-        '개포동': 1.4    # 신축 대단지
-    }
-    
-    # 아파트 브랜드
-    apt_brands = ['현대', '래미안', '자이', '힐스테이트', '아이파크', '푸르지오', '더샵', 'e편한세상', '아크로', '롯데캐슬']
+    districts = DISTRICTS
+    apt_brands = APT_BRANDS
     
     data = []
     
@@ -94,6 +99,79 @@ def create_realistic_sales_data(num_rows=200000):
         
     return pd.DataFrame(data)
 
+def create_realistic_rent_data(num_rows=100000):
+    """
+    아파트 '전월세' 실거래가를 모방한 데이터 생성
+    (전세가율 및 월세 전환율 로직 반영)
+    """
+    districts = DISTRICTS
+    apt_brands = APT_BRANDS
+    
+    data = []
+    
+    for _ in range(num_rows):
+        # 기본 정보 생성 (매매와 동일한 방식)
+        dong = random.choice(list(districts.keys()))
+        brand = random.choice(apt_brands)
+        apt_name = f"{dong} {brand}"
+        floor = random.randint(1, 45)
+        area = random.choice([59.9, 84.9, 114.5, 135.8]) + round(random.uniform(-1, 1), 2)
+        build_year = random.randint(1980, 2024)
+        age = 2024 - build_year
+        
+        # --- 전세가 결정 로직 (단위: 만원) ---
+        
+        # 1. 기본 전세가 = 평수 * 평당 전세가 * 동네 가중치
+        # (매매 평당가의 약 45~60% 수준, 재건축 기대감은 전세가에 반영되지 않음)
+        base_jeonse_per_pyeong = random.randint(2500, 4500)
+        pyeong = area / 3.3
+        jeonse = pyeong * base_jeonse_per_pyeong * districts[dong]
+        
+        # 2. 연식에 따른 보정 (신축은 비싸고, 오래될수록 저렴)
+        if age <= 5:
+            jeonse *= 1.2 # 신축 프리미엄 (+20%)
+        elif age >= 30:
+            jeonse *= 0.75 # 노후 감가 (-25%)
+        elif age >= 15:
+            jeonse *= 0.9
+        
+        # 3. 층수 보정
+        if floor >= 20:
+            jeonse += (floor * 100)
+        elif floor <= 3:
+            jeonse -= 3000
+        
+        # 4. 랜덤 변동성 추가
+        jeonse = max(jeonse + random.randint(-8000, 8000), 20000)
+        
+        # --- 전세 / 월세 구분 (약 40%는 월세) ---
+        if random.random() < 0.4:
+            # 보증금은 전세가의 10~40%, 나머지는 연 4.5% 전환율로 월세 환산
+            deposit = jeonse * random.uniform(0.1, 0.4)
+            monthly_rent = (jeonse - deposit) * 0.045 / 12
+            deposit = int(deposit / 1000) * 1000         # 1,000만원 단위 절삭
+            monthly_rent = max(int(monthly_rent / 5) * 5, 5) # 5만원 단위 절삭
+        else:
+            deposit = int(jeonse / 100) * 100             # 100만원 단위 절삭
+            monthly_rent = 0
+        
+        # 데이터 적재 (API 원본처럼 금액은 콤마 포함 문자열)
+        row = {
+            '아파트': apt_name,
+            '법정동': dong,
+            '보증금액': f'{deposit:,}',
+            '월세금액': f'{monthly_rent:,}',
+            '건축년도': build_year,
+            '전용면적': round(area, 2),
+            '층': floor,
+            '년': 2024,
+            '월': random.randint(1, 12),
+            '일': random.randint(1, 28)
+        }
+        data.append(row)
+        
+    return pd.DataFrame(data)
+
 if __name__ == "__main__":
     # 데이터 생성
     df = create_realistic_sales_data(NUM_ROWS)
@@ -105,4 +183,14 @@ if __name__ == "__main__":
     print(f"생성된 데이터 수: {len(df)}건")
     print(f"저장 파일명: {OUTPUT_FILENAME}")
     print("\n[데이터 미리보기]")
-    print(df.head())
\ No newline at end of file
+    print(df.head())
+    
+    # 전월세 데이터 생성
+    rent_df = create_realistic_rent_data(NUM_RENT_ROWS)
+    rent_df.to_csv(RENT_OUTPUT_FILENAME, index=False, encoding='utf-8-sig')
+    
+    print("\n--- [전월세] 가상 데이터 생성 완료 ---")
+    print(f"생성된 데이터 수: {len(rent_df)}건")
+    print(f"저장 파일명: {RENT_OUTPUT_FILENAME}")
+    print("\n[데이터 미리보기]")
+    print(rent_df.head())
\ No newline at end of file
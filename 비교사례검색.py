@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# === 7. 비교 사례(Comps) 검색 인덱스 ===
+# 설명: 감정평가용으로 특정 매물과 가장 비슷한 과거 거래 k건을 바로 찾아줍니다.
+#       같은 법정동 안에서 전용면적, 층, 건축년도, 계약일자가 가까운 순서로 검색하며,
+#       법정동마다 KD-트리를 따로 만들어 전체 데이터를 훑지 않습니다.
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+INPUT_FILE = 'apartment_sales_processed.csv'
+
+# 거리 계산 시 각 특성을 나누는 값 (이만큼 차이 나면 거리 1)
+# 예: 면적 10㎡ 차이 = 층 5개 차이 = 건축년도 5년 차이 = 계약일자 180일 차이
+FEATURE_SCALES = {
+    '전용면적(㎡)': 10.0,
+    '층': 5.0,
+    '건축년도': 5.0,
+    '계약일자': 180.0,  # 일 단위
+}
+FEATURE_COLS = list(FEATURE_SCALES)
+
+DEFAULT_K = 10
+LEAF_SIZE = 40
+# 새로 추가된 거래는 임시 버퍼에서 직접 비교하다가,
+# 버퍼가 트리 크기의 REBUILD_RATIO 또는 REBUILD_MIN건을 넘으면 해당 동의 트리만 다시 만듭니다.
+REBUILD_MIN = 2048
+REBUILD_RATIO = 0.1
+
+BENCH_ROWS = 2_000_000
+BENCH_BATCH_SIZES = [100, 10_000] # 단건은 query_point() 빠른 경로로 따로 측정
+LATENCY_BUDGET_MS = 1.0 # 질의 1건당 허용 지연 시간
+
+def _to_points(df):
+    """비교용 특성을 스케일을 맞춘 float64 배열로 변환합니다."""
+    cols = []
+    for col in FEATURE_COLS:
+        values = df[col]
+        if col == '계약일자':
+            values = pd.to_datetime(values).to_numpy(dtype='datetime64[D]').astype(np.int64).astype(np.float64)
+        else:
+            values = values.to_numpy(dtype=np.float64)
+        cols.append(values / FEATURE_SCALES[col])
+    return np.column_stack(cols)
+
+def scale_point(area, floor, build_year, contract_date):
+    """
+    매물 1건의 특성을 pandas 없이 스케일을 맞춘 점으로 변환합니다. (query_point용)
+    contract_date: 'YYYY-MM-DD' 문자열 또는 np.datetime64
+    """
+    day = np.datetime64(contract_date, 'D').astype(np.int64)
+    return np.array([
+        area / FEATURE_SCALES['전용면적(㎡)'],
+        floor / FEATURE_SCALES['층'],
+        build_year / FEATURE_SCALES['건축년도'],
+        day / FEATURE_SCALES['계약일자'],
+    ])
+
+class CompsIndex:
+    """
+    법정동별 KD-트리 + 추가 거래 버퍼로 구성된 비교 사례 인덱스.
+    - query_ids(): 여러 매물을 한 번에 검색 (거리, 행 번호 배열 반환)
+    - query(): 검색 결과를 원본 거래 행과 함께 DataFrame으로 반환
+    - query_point(): 매물 1건(또는 같은 동의 소수 매물)을 pandas 없이 바로 검색
+    - insert(): 새 거래를 추가 (전체 재구축 없이 해당 동만 필요 시 재구축)
+    """
+
+    def __init__(self, df):
+        self._frames = []
+        self._records = None
+        self._n_rows = 0
+        self._dongs = {}
+        self._latest_day = -np.inf # 스케일된 가장 최근 계약일자
+        self.insert(df)
+
+    def __len__(self):
+        return self._n_rows
+
+    @property
+    def records(self):
+        """인덱스에 들어 있는 전체 거래 (행 번호 = query 결과의 번호)"""
+        if self._records is None or len(self._records) != self._n_rows:
+            self._records = pd.concat(self._frames, ignore_index=True)
+            self._frames = [self._records]
+        return self._records
+
+    def insert(self, df):
+        """새 거래를 추가합니다. 행 번호는 기존 거래 뒤에 이어서 매겨집니다."""
+        df = df.reset_index(drop=True)
+        if df.empty:
+            return
+        ids = np.arange(self._n_rows, self._n_rows + len(df))
+        points = _to_points(df)
+        dongs = df['법정동'].astype(str).to_numpy()
+
+        self._frames.append(df)
+        self._n_rows += len(df)
+        self._latest_day = max(self._latest_day, points[:, -1].max())
+
+        order = np.argsort(dongs, kind='stable')
+        uniq, starts = np.unique(dongs[order], return_index=True)
+        for dong, group in zip(uniq, np.split(order, starts[1:])):
+            entry = self._dongs.setdefault(dong, {
+                'tree': None, 'tree_ids': np.empty(0, dtype=np.int64),
+                'buf_points': [], 'buf_ids': [], 'buf_size': 0,
+            })
+            entry['buf_points'].append(points[group])
+            entry['buf_ids'].append(ids[group])
+            entry['buf_size'] += len(group)
+            entry['buf_cache'] = None
+            if entry['buf_size'] > max(REBUILD_MIN, REBUILD_RATIO * len(entry['tree_ids'])):
+                self._rebuild(entry)
+
+    def _rebuild(self, entry):
+        points = [np.asarray(entry['tree'].data)] if entry['tree'] is not None else []
+        points += entry['buf_points']
+        entry['tree_ids'] = np.concatenate([entry['tree_ids']] + entry['buf_ids'])
+        entry['tree'] = KDTree(np.concatenate(points), leaf_size=LEAF_SIZE)
+        entry['buf_points'], entry['buf_ids'], entry['buf_size'] = [], [], 0
+        entry['buf_cache'] = None
+
+    @staticmethod
+    def _buffer_search(entry, q, k, block_elems=4_000_000):
+        """버퍼는 크기가 작으므로 직접 거리를 계산합니다. (메모리 제한을 위해 질의를 나눠 처리)"""
+        if entry.get('buf_cache') is None:
+            entry['buf_cache'] = (np.concatenate(entry['buf_points']), np.concatenate(entry['buf_ids']))
+        buf, buf_ids = entry['buf_cache']
+        kk = min(k, len(buf))
+        out_dist = np.empty((len(q), kk))
+        out_ids = np.empty((len(q), kk), dtype=np.int64)
+        step = max(1, block_elems // (len(buf) * buf.shape[1]))
+        for start in range(0, len(q), step):
+            qb = q[start:start + step]
+            dist = np.sqrt(((qb[:, None, :] - buf[None, :, :]) ** 2).sum(axis=2))
+            part = np.argpartition(dist, kk - 1, axis=1)[:, :kk]
+            out_dist[start:start + step] = np.take_along_axis(dist, part, axis=1)
+            out_ids[start:start + step] = buf_ids[part]
+        return out_dist, out_ids
+
+    def _search(self, entry, q, k):
+        """한 법정동 안에서 스케일된 점들(q)의 k-최근접 거래를 찾습니다. (트리 + 버퍼 병합)"""
+        out_dist = np.full((len(q), k), np.inf)
+        out_ids = np.full((len(q), k), -1, dtype=np.int64)
+        dists, ids = [], []
+        if entry['tree'] is not None:
+            kk = min(k, len(entry['tree_ids']))
+            d, local = entry['tree'].query(q, k=kk)
+            dists.append(d)
+            ids.append(entry['tree_ids'][local])
+        if entry['buf_size']:
+            d, i = self._buffer_search(entry, q, k)
+            dists.append(d)
+            ids.append(i)
+
+        if len(dists) == 1:
+            dist, idx = dists[0], ids[0]
+        else:
+            dist = np.concatenate(dists, axis=1)
+            idx = np.concatenate(ids, axis=1)
+            best = np.argsort(dist, axis=1, kind='stable')[:, :k]
+            dist = np.take_along_axis(dist, best, axis=1)
+            idx = np.take_along_axis(idx, best, axis=1)
+        out_dist[:, :dist.shape[1]] = dist
+        out_ids[:, :idx.shape[1]] = idx
+        return out_dist, out_ids
+
+    def query_point(self, dong, points, k=DEFAULT_K):
+        """
+        빠른 경로: 같은 법정동의 매물 1건 또는 소수를 pandas 없이 검색합니다.
+        points: scale_point()로 만든 점 (4,) 또는 (질의 수 x 4) 배열.
+                계약일자 자리에 NaN을 넣으면 인덱스의 가장 최근 거래일을 사용합니다.
+        반환값: (거리 배열 [질의 수 x k], 행 번호 배열 [질의 수 x k])
+        """
+        q = np.array(points, dtype=np.float64, ndmin=2)
+        q[np.isnan(q[:, -1]), -1] = self._latest_day
+        entry = self._dongs.get(dong)
+        if entry is None:
+            return np.full((len(q), k), np.inf), np.full((len(q), k), -1, dtype=np.int64)
+        return self._search(entry, q, k)
+
+    def query_ids(self, queries, k=DEFAULT_K):
+        """
+        여러 매물(DataFrame)을 한 번에 검색합니다.
+        반환값: (거리 배열 [질의 수 x k], 행 번호 배열 [질의 수 x k])
+        비교 사례가 k건보다 적으면 거리는 inf, 행 번호는 -1로 채웁니다.
+        """
+        queries = queries.reset_index(drop=True)
+        if '계약일자' in queries.columns:
+            points = _to_points(queries)
+        else:
+            # 계약일자가 없으면 인덱스의 가장 최근 거래일을 기준으로 합니다. (최근 거래 우선)
+            points = _to_points(queries.assign(계약일자=pd.Timestamp(0)))
+            points[:, -1] = self._latest_day
+        dongs = queries['법정동'].astype(str).to_numpy()
+
+        out_dist = np.full((len(queries), k), np.inf)
+        out_ids = np.full((len(queries), k), -1, dtype=np.int64)
+
+        order = np.argsort(dongs, kind='stable')
+        uniq, starts = np.unique(dongs[order], return_index=True)
+        for dong, group in zip(uniq, np.split(order, starts[1:])):
+            entry = self._dongs.get(dong)
+            if entry is None:
+                continue
+            out_dist[group], out_ids[group] = self._search(entry, points[group], k)
+
+        return out_dist, out_ids
+
+    def query(self, queries, k=DEFAULT_K):
+        """검색 결과를 '질의번호', '순위', '거리' 컬럼이 붙은 거래 목록으로 반환합니다."""
+        dist, ids = self.query_ids(queries, k)
+        query_no, rank = np.nonzero(ids >= 0)
+        result = self.records.iloc[ids[query_no, rank]].reset_index(drop=True)
+        result.insert(0, '질의번호', query_no)
+        result.insert(1, '순위', rank + 1)
+        result.insert(2, '거리', dist[query_no, rank])
+        return result
+
+def _enlarge(df, n_rows, seed=42):
+    """벤치마크용: 데이터를 n_rows건이 되도록 복원 추출하고 수치 특성에 약간의 잡음을 더합니다."""
+    if len(df) >= n_rows:
+        return df
+    rng = np.random.default_rng(seed)
+    big = df.iloc[rng.integers(0, len(df), size=n_rows)].reset_index(drop=True)
+    big['전용면적(㎡)'] = big['전용면적(㎡)'] + rng.uniform(-0.5, 0.5, n_rows)
+    big['계약일자'] = pd.to_datetime(big['계약일자']) + pd.to_timedelta(rng.integers(-365, 365, n_rows), unit='D')
+    return big
+
+def benchmark_latency(index, queries, k=DEFAULT_K, batch_sizes=BENCH_BATCH_SIZES, repeat=5,
+                      budget_ms=LATENCY_BUDGET_MS, n_single=1000):
+    """
+    질의 1건당 평균 지연 시간(밀리초)을 측정하고 budget_ms와 비교합니다.
+    - 단건: query_point() 빠른 경로로 n_single건을 한 건씩 검색
+    - 배치: query_ids()로 배치 크기별 검색
+    모든 측정값이 기준 안이면 True를 함께 반환합니다.
+    """
+    print(f"\n--- 비교 사례 검색 지연 시간 (인덱스 {len(index):,}건, k={k}, 기준 {budget_ms} ms) ---")
+    results = []
+
+    # 1. 단건 빠른 경로 (점 변환은 호출하는 쪽에서 미리 해 둔 상태를 가정)
+    singles = queries.iloc[:n_single]
+    points = _to_points(singles)
+    dongs = singles['법정동'].astype(str).tolist()
+    t0 = time.perf_counter()
+    for dong, point in zip(dongs, points):
+        index.query_point(dong, point, k)
+    results.append(('단건(query_point)', (time.perf_counter() - t0) / len(dongs) * 1000))
+
+    # 2. 배치 검색
+    for batch_size in batch_sizes:
+        batch = queries.iloc[:batch_size]
+        n_repeat = repeat if batch_size < 10_000 else 1
+        t0 = time.perf_counter()
+        for _ in range(n_repeat):
+            index.query_ids(batch, k)
+        per_query_ms = (time.perf_counter() - t0) / n_repeat / len(batch) * 1000
+        results.append((f'배치 {len(batch):,}건(query_ids)', per_query_ms))
+
+    ok = True
+    for name, per_query_ms in results:
+        status = '통과' if per_query_ms <= budget_ms else '초과'
+        ok = ok and per_query_ms <= budget_ms
+        print(f" {name:<22} | 질의당 {per_query_ms:.4f} ms | {status}")
+    if not ok:
+        print(f"[경고] 질의당 지연 시간이 기준({budget_ms} ms)을 넘은 항목이 있습니다.")
+    return results, ok
+
+if __name__ == "__main__":
+    # 파일 존재 여부 확인
+    if not os.path.exists(INPUT_FILE):
+        print(f"[오류] '{INPUT_FILE}' 파일이 없습니다.")
+        print(">>> '데이터전처리.py'를 먼저 실행해서 매매 데이터를 준비해주세요!")
+        sys.exit(1)
+
+    df = pd.read_csv(INPUT_FILE, encoding='utf-8-sig', parse_dates=['계약일자'])
+    print(f"전처리된 데이터 로드 성공: {len(df)}건")
+
+    # 1. 인덱스 구축 (벤치마크를 위해 BENCH_ROWS건으로 확대)
+    data = _enlarge(df, BENCH_ROWS)
+    t0 = time.perf_counter()
+    index = CompsIndex(data)
+    print(f"인덱스 구축 완료: {len(index):,}건, {time.perf_counter() - t0:.1f}초")
+
+    # 2. 지연 시간 측정
+    queries = df.sample(n=max(BENCH_BATCH_SIZES), replace=True, random_state=0)
+    _, ok_before = benchmark_latency(index, queries)
+
+    # 3. 신규 거래 추가 후 지연 시간 재측정
+    t0 = time.perf_counter()
+    index.insert(df.sample(n=1000, random_state=1))
+    print(f"\n신규 거래 1,000건 추가: {(time.perf_counter() - t0) * 1000:.1f} ms")
+    _, ok_after = benchmark_latency(index, queries)
+
+    # 4. 검색 예시
+    print("\n--- 비교 사례 예시 ---")
+    print(df.iloc[[0]])
+    print(index.query(df.iloc[[0]], k=5))
+
+    # 기준을 넘으면 실패로 종료합니다.
+    sys.exit(0 if ok_before and ok_after else 1)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# === 6-1. 고속 추론 커널 (numba) ===
+# 설명: 고속추론.py의 평평한 모델을 탐색하는 컴파일된 커널입니다.
+#       numba는 불러오는 데만 0.5초 이상 걸리므로, 고속추론.py가 대량 배치를
+#       예측할 때만 이 모듈을 불러옵니다. 컴파일 결과는 __pycache__에 캐시되어
+#       두 번째 실행부터는 다시 컴파일하지 않습니다.
+
+import numpy as np
+from numba import njit, prange
+
+@njit(parallel=True, nogil=True, cache=True)
+def traverse_forest(nodes, nodes_f, value, roots, X, scale, bias, group, out):
+    """
+    nodes: 노드당 16바이트 레코드 [특성 번호, 임계값(float32 비트), 왼쪽 자식, 오른쪽 자식]
+    nodes_f: 같은 메모리를 float32로 본 배열 (임계값은 nodes_f[node, 1])
+
+    행을 group개씩 묶어 여러 코어에 나누고, 트리마다 묶음 안의 행들을 한 단계씩
+    번갈아 내려보냅니다. 서로 독립인 노드 읽기가 동시에 진행되므로, 트리가 캐시보다
+    커도 메모리 대기 시간이 겹쳐서 가려집니다.
+    """
+    n_rows = X.shape[0]
+    n_groups = (n_rows + group - 1) // group
+    for b in prange(n_groups):
+        lo = b * group
+        size = min(group, n_rows - lo)
+        acc = np.zeros(size)
+        cur = np.empty(size, dtype=np.int32)
+        for t in range(roots.shape[0]):
+            for j in range(size):
+                cur[j] = roots[t]
+            n_active = size
+            while n_active:
+                n_active = 0
+                for j in range(size):
+                    node = cur[j]
+                    if node >= 0:
+                        if X[lo + j, nodes[node, 0]] <= nodes_f[node, 1]:
+                            node = nodes[node, 2]
+                        else:
+                            node = nodes[node, 3]
+                        cur[j] = node
+                        if node >= 0:
+                            n_active += 1
+            for j in range(size):
+                acc[j] += value[~cur[j]]
+        for j in range(size):
+            out[lo + j] = acc[j] * scale + bias
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# === 전체 파이프라인 실행기 (CLI) ===
+# 설명: 각 단계를 하위 명령으로 실행합니다.
+#       무거운 라이브러리(pandas, matplotlib, seaborn, scikit-learn)는
+#       해당 명령을 실행할 때만 불러오므로, 예측(score)은 NumPy만으로 빠르게 시작합니다.
+#
+# 사용 예:
+#   python 파이프라인.py generate      # 모의 데이터 생성
+#   python 파이프라인.py preprocess    # 전처리
+#   python 파이프라인.py features      # 분석 및 피처 엔지니어링
+#   python 파이프라인.py train         # 모델 학습 및 평가 (--export-model: 고속 추론용 모델도 저장)
+#   python 파이프라인.py visualize     # 전월세 데이터 시각화
+#   python 파이프라인.py score -i apartment_sales_final_features.csv -o predictions.csv
+#   python 파이프라인.py startup-check # 1건 예측(score)의 전체 실행 시간 점검
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 1건 예측(score)의 시작 시간 기준: 인터프리터 시작과 NumPy import를 포함한 새 프로세스의 전체 실행 시간
+STARTUP_BUDGET_MS = 300
+STARTUP_REPEAT = 3 # 가장 빠른 실행 시간을 기준으로 비교 (첫 실행은 디스크 캐시 준비용으로 제외)
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'sklearn', 'scipy', 'joblib', 'numba']
+LOADED_MARKER = '[불러온 모듈]'
+# score 명령을 그대로 실행한 뒤, 예측까지 끝난 시점의 최상위 모듈 목록을 한 줄로 출력합니다.
+SCORE_CHECK_CODE = (
+    f"import sys; sys.path.insert(0, {BASE_DIR!r}); import 파이프라인\n"
+    "code = 파이프라인.main(sys.argv[1:])\n"
+    f"print({LOADED_MARKER!r}, ' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))\n"
+    "sys.exit(code)"
+)
+
+def _run_script(filename):
+    """기존 단계별 스크립트를 직접 실행한 것과 똑같이 실행합니다."""
+    import runpy
+    runpy.run_path(os.path.join(BASE_DIR, filename), run_name='__main__')
+
+def measure_import_time(args):
+    """
+    새 파이썬 프로세스에서 `python -X importtime <args>`를 실행하고,
+    모듈별 누적 import 시간[ms] 중 최상위 항목을 반환합니다. (어디서 시간이 드는지 확인용)
+    """
+    import subprocess
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + args, capture_output=True, text=True)
+
+    top_level = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name_field = line[len('import time:'):].split('|')
+        # 들여쓰기가 없는(한 칸 공백만 있는) 항목이 최상위 import 입니다.
+        if not name_field[1:].startswith(' '):
+            top_level[name_field.strip()] = int(cumulative) / 1000
+    return top_level
+
+def _time_process(args, repeat=STARTUP_REPEAT):
+    """새 파이썬 프로세스로 args를 repeat번 실행하고 (가장 빠른 실행 시간[ms], 마지막 실행 결과)를 반환합니다."""
+    import subprocess
+    subprocess.run([sys.executable] + args, capture_output=True, text=True)
+    best_ms = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable] + args, capture_output=True, text=True)
+        best_ms = min(best_ms, (time.perf_counter() - t0) * 1000)
+    return best_ms, proc
+
+def check_startup_budget(input_file, model_file=None, budget_ms=STARTUP_BUDGET_MS):
+    """
+    `python 파이프라인.py score`로 입력 파일의 첫 1건을 예측하는 데 걸리는 전체 시간이
+    기준 안에 들어오고, 예측이 끝난 뒤에도 무거운 라이브러리를 불러오지 않았는지 점검합니다.
+    """
+    import tempfile
+    if not os.path.exists(input_file):
+        print(f"[오류] '{input_file}' 파일이 없습니다.")
+        return False
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        one_row_file = os.path.join(tmp_dir, 'one_row.csv')
+        with open(input_file, encoding='utf-8-sig') as src, open(one_row_file, 'w', encoding='utf-8-sig') as dst:
+            dst.write(src.readline())
+            dst.write(src.readline())
+        score_args = ['score', '-i', one_row_file, '-o', os.path.join(tmp_dir, 'prediction.csv')]
+        if model_file:
+            score_args += ['-m', model_file]
+
+        total_ms, proc = _time_process(['-c', SCORE_CHECK_CODE] + score_args)
+        if proc.returncode != 0:
+            print(proc.stdout.strip())
+            print("[실패] 1건 예측(score)이 실패했습니다.")
+            return False
+        baseline_ms, _ = _time_process(['-c', 'import numpy'])
+        top_level = measure_import_time(['-c', SCORE_CHECK_CODE] + score_args)
+
+    loaded = set()
+    for line in proc.stdout.splitlines():
+        if line.startswith(LOADED_MARKER):
+            loaded = set(line[len(LOADED_MARKER):].split())
+    heavy = sorted(set(HEAVY_MODULES) & loaded)
+
+    print("--- 시작 시간 점검: `python 파이프라인.py score` (1건) ---")
+    print(" import 시간 상위 항목 (python -X importtime):")
+    for name, ms in sorted(top_level.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {name:<20} {ms:8.1f} ms")
+    print(f" 참고: `python -c \"import numpy\"` {baseline_ms:.1f} ms")
+    print(f" 전체 실행 시간: {total_ms:.1f} ms (기준 {budget_ms} ms, {STARTUP_REPEAT}회 중 최소)")
+
+    ok = total_ms <= budget_ms and not heavy
+    if heavy:
+        print(f"[실패] 예측 경로에서 무거운 라이브러리를 불러왔습니다: {heavy}")
+    if total_ms > budget_ms:
+        print(f"[실패] 실행 시간이 기준을 {total_ms - budget_ms:.1f} ms 초과했습니다.")
+    if ok:
+        print("[통과] 시작 시간 기준을 만족합니다.")
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='아파트 매매가 예측 파이프라인')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('generate', help='모의 매매/전월세 데이터 생성 (모의데이터.py)')
+    sub.add_parser('preprocess', help='매매/전월세 데이터 전처리 (데이터전처리.py)')
+    sub.add_parser('features', help='분석 및 피처 엔지니어링 (데이터분서.py)')
+    train = sub.add_parser('train', help='모델 학습 및 평가 (데이터학습및평가.py)')
+    train.add_argument('--export-model', action='store_true', help='score용 고속 추론 모델 파일(.npz)도 저장')
+    sub.add_parser('visualize', help='전월세 데이터 시각화 (데이터시각화py)')
+
+    score = sub.add_parser('score', help='저장된 모델로 매매가 예측 (NumPy만 사용)')
+    score.add_argument('-i', '--input', default='apartment_sales_final_features.csv', help='특성 CSV 파일')
+    score.add_argument('-o', '--output', default='apartment_sales_predictions.csv', help='예측 결과 CSV 파일')
+    score.add_argument('-m', '--model', default=None, help='고속 추론용 모델 파일 (.npz)')
+    score.add_argument('-j', '--jobs', type=int, default=None, help='예측에 사용할 스레드 수')
+
+    startup = sub.add_parser('startup-check', help='1건 예측(score)의 전체 실행 시간 점검')
+    startup.add_argument('-i', '--input', default='apartment_sales_final_features.csv', help='첫 1건을 예측할 특성 CSV 파일')
+    startup.add_argument('-m', '--model', default=None, help='고속 추론용 모델 파일 (.npz)')
+    startup.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS, help='허용 실행 시간 (ms)')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        _run_script('모의데이터.py')
+    elif args.command == 'preprocess':
+        _run_script('데이터전처리.py')
+    elif args.command == 'features':
+        _run_script('데이터분서.py')
+    elif args.command == 'train':
+        from 데이터학습및평가 import train_and_evaluate
+        train_and_evaluate(export_model=args.export_model)
+    elif args.command == 'visualize':
+        _run_script('데이터시각화py')
+    elif args.command == 'score':
+        from 고속추론 import MODEL_FILE, score_csv
+        score_csv(args.input, args.output, args.model or MODEL_FILE, n_jobs=args.jobs)
+    elif args.command == 'startup-check':
+        return 0 if check_startup_budget(args.input, args.model, args.budget_ms) else 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())